@@ -1,17 +1,75 @@
 import librosa
 import numpy as np
-from typing import Any
-from numpy.typing import NDArray as npndarray
+from typing import Any, Callable, Literal, TypedDict
 import logging
+from .progress import ProgressCallback, ProgressReporter
 
 SR = 22050
 N_FFT = 2048
 HOP_LENGTH = 512
+ONSET_N_FFT = 2048
+CQT_BINS_PER_OCTAVE = 36
+CQT_CONTEXT_SAMPLES = 2**15
+CHUNK_FRAMES = 2048
+TEMPO_AC_SIZE = 8.0
+TEMPO_WINDOW_FRAMES = 2048
 
 
-def load_audio(file_path: str) -> tuple[np.ndarray, float]:
+class AnalysisProfile(TypedDict):
+    name: str
+    sr: int
+    n_fft: int
+    hop_length: int
+    chroma: Literal["stft", "cqt"]
+    res_type: str
+
+
+PROFILES: dict[str, AnalysisProfile] = {
+    "fast": {
+        "name": "fast",
+        "sr": 11025,
+        "n_fft": 1024,
+        "hop_length": 512,
+        "chroma": "stft",
+        "res_type": "soxr_lq",
+    },
+    "balanced": {
+        "name": "balanced",
+        "sr": SR,
+        "n_fft": N_FFT,
+        "hop_length": HOP_LENGTH,
+        "chroma": "cqt",
+        "res_type": "soxr_hq",
+    },
+    "accurate": {
+        "name": "accurate",
+        "sr": SR,
+        "n_fft": 4096,
+        "hop_length": 256,
+        "chroma": "cqt",
+        "res_type": "soxr_vhq",
+    },
+}
+DEFAULT_PROFILE = "balanced"
+
+
+def get_profile(name: str | None = None) -> AnalysisProfile:
+    profile = PROFILES.get(name or DEFAULT_PROFILE)
+    if profile is None:
+        raise ValueError(
+            f"Unknown analysis profile '{name}'. Expected one of: {', '.join(PROFILES)}"
+        )
+    return profile
+
+
+def load_audio(
+    file_path: str, profile: AnalysisProfile | None = None
+) -> tuple[np.ndarray, float]:
+    profile = profile or get_profile()
     try:
-        y, sr = librosa.load(file_path, sr=SR, mono=True)
+        y, sr = librosa.load(
+            file_path, sr=profile["sr"], mono=True, res_type=profile["res_type"]
+        )
         return (y, sr)
     except Exception as e:
         logging.exception(f"Error loading audio file: {e}")
@@ -39,12 +97,127 @@ def get_waveform_data(y: np.ndarray, points: int = 500) -> list[float]:
         return [0.0] * points
 
 
-def detect_tempo_and_beats(y: np.ndarray, sr: float) -> tuple[float, np.ndarray]:
-    tempo, beat_frames = librosa.beat.beat_track(y=y, sr=sr, hop_length=HOP_LENGTH)
-    beat_times = librosa.frames_to_time(beat_frames, sr=sr, hop_length=HOP_LENGTH)
+def _compute_chunked(
+    y: np.ndarray,
+    hop_length: int,
+    context: int,
+    compute: Callable[[np.ndarray], np.ndarray],
+    progress: ProgressCallback | None = None,
+) -> np.ndarray:
+    n_frames = 1 + len(y) // hop_length
+    chunks = []
+    for start_frame in range(0, n_frames, CHUNK_FRAMES):
+        end_frame = min(start_frame + CHUNK_FRAMES, n_frames)
+        start = max(0, start_frame * hop_length - context)
+        end = min(len(y), end_frame * hop_length + context)
+        offset = start_frame - start // hop_length
+        features = compute(y[start:end])
+        chunks.append(features[:, offset : offset + end_frame - start_frame])
+        if progress:
+            progress(end_frame / n_frames)
+    return np.hstack(chunks)
+
+
+def estimate_tempo(
+    onset_envelope: np.ndarray, sr: float, hop_length: int
+) -> np.ndarray:
+    win_length = int(
+        librosa.time_to_frames(TEMPO_AC_SIZE, sr=sr, hop_length=hop_length)
+    )
+    n_frames = len(onset_envelope)
+    tempogram_sum = np.zeros(win_length)
+    for start_frame in range(0, n_frames, TEMPO_WINDOW_FRAMES):
+        end_frame = min(start_frame + TEMPO_WINDOW_FRAMES, n_frames)
+        start = max(0, start_frame - win_length)
+        tempogram = librosa.feature.tempogram(
+            onset_envelope=onset_envelope[start : end_frame + win_length],
+            sr=sr,
+            hop_length=hop_length,
+            win_length=win_length,
+        )
+        offset = start_frame - start
+        tempogram_sum += tempogram[:, offset : offset + end_frame - start_frame].sum(
+            axis=1
+        )
+    mean_tempogram = (tempogram_sum / max(1, n_frames))[:, np.newaxis]
+    return librosa.feature.tempo(tg=mean_tempogram, sr=sr, hop_length=hop_length)
+
+
+def track_beats(
+    onset_envelope: np.ndarray, sr: float, hop_length: int
+) -> tuple[np.ndarray, np.ndarray]:
+    tempo = estimate_tempo(onset_envelope, sr, hop_length)
+    return librosa.beat.beat_track(
+        onset_envelope=onset_envelope, sr=sr, hop_length=hop_length, bpm=tempo[0]
+    )
+
+
+def detect_tempo_and_beats(
+    y: np.ndarray,
+    sr: float,
+    profile: AnalysisProfile | None = None,
+    progress: ProgressCallback | None = None,
+) -> tuple[float, np.ndarray]:
+    hop_length = (profile or get_profile())["hop_length"]
+    mel = _compute_chunked(
+        y,
+        hop_length,
+        ONSET_N_FFT,
+        lambda segment: librosa.feature.melspectrogram(
+            y=segment, sr=sr, n_fft=ONSET_N_FFT, hop_length=hop_length
+        ),
+        progress,
+    )
+    onset_envelope = librosa.onset.onset_strength(
+        S=librosa.power_to_db(mel),
+        sr=sr,
+        n_fft=ONSET_N_FFT,
+        hop_length=hop_length,
+        aggregate=np.median,
+    )
+    tempo, beat_frames = track_beats(onset_envelope, sr, hop_length)
+    beat_times = librosa.frames_to_time(beat_frames, sr=sr, hop_length=hop_length)
     return (tempo, beat_times)
 
 
+def compute_chroma(
+    y: np.ndarray,
+    sr: float,
+    profile: AnalysisProfile | None = None,
+    progress: ProgressCallback | None = None,
+) -> np.ndarray:
+    profile = profile or get_profile()
+    hop_length = profile["hop_length"]
+    if profile["chroma"] == "cqt":
+        tuning = librosa.estimate_tuning(
+            y=y, sr=sr, bins_per_octave=CQT_BINS_PER_OCTAVE
+        )
+        return _compute_chunked(
+            y,
+            hop_length,
+            CQT_CONTEXT_SAMPLES,
+            lambda segment: librosa.feature.chroma_cqt(
+                y=segment,
+                sr=sr,
+                hop_length=hop_length,
+                bins_per_octave=CQT_BINS_PER_OCTAVE,
+                tuning=tuning,
+            ),
+            progress,
+        )
+    n_fft = profile["n_fft"]
+    tuning = librosa.estimate_tuning(y=y, sr=sr, n_fft=n_fft)
+    return _compute_chunked(
+        y,
+        hop_length,
+        n_fft,
+        lambda segment: librosa.feature.chroma_stft(
+            y=segment, sr=sr, n_fft=n_fft, hop_length=hop_length, tuning=tuning
+        ),
+        progress,
+    )
+
+
 KS_PROFILE = {
     "major": [6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88],
     "minor": [6.33, 2.68, 3.52, 5.38, 2.6, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17],
@@ -52,8 +225,7 @@ KS_PROFILE = {
 NOTES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
 
 
-def detect_key(y: np.ndarray, sr: float) -> str:
-    chroma = librosa.feature.chroma_stft(y=y, sr=sr)
+def key_from_chroma(chroma: np.ndarray) -> str:
     chroma_sum = np.sum(chroma, axis=1)
     correlations = []
 
@@ -69,19 +241,21 @@ def detect_key(y: np.ndarray, sr: float) -> str:
     return best_fit[1].capitalize()
 
 
+CHORD_QUALITIES = {
+    "maj": [1, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0],
+    "min": [1, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0],
+    "dim": [1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0],
+    "aug": [1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0],
+    "sus2": [1, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0],
+    "sus4": [1, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0],
+    "7": [1, 0, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0],
+}
+
+
 def get_chord_templates() -> dict[str, np.ndarray]:
     templates = {}
-    qualities = {
-        "maj": [1, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0],
-        "min": [1, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0],
-        "dim": [1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0],
-        "aug": [1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0],
-        "sus2": [1, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0],
-        "sus4": [1, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0],
-        "7": [1, 0, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0],
-    }
     for root_i, root_name in enumerate(NOTES):
-        for quality, pattern in qualities.items():
+        for quality, pattern in CHORD_QUALITIES.items():
             rotated_pattern = np.roll(pattern, root_i)
             chord_name = f"{root_name}:{quality}"
             templates[chord_name] = rotated_pattern
@@ -101,11 +275,16 @@ def _get_max_correlation_item(items):
     return max(items, key=get_correlation_value)
 
 
-def recognize_chords(
-    y: npndarray, sr: float, beat_times: np.ndarray
+def chords_from_chroma(
+    chroma: np.ndarray,
+    sr: float,
+    beat_times: np.ndarray,
+    hop_length: int,
+    n_fft: int | None = None,
 ) -> list[dict[str, float | str]]:
-    chroma = librosa.feature.chroma_cqt(y=y, sr=sr)
-    beat_frames = librosa.time_to_frames(beat_times, sr=sr)
+    beat_frames = librosa.time_to_frames(
+        beat_times, sr=sr, hop_length=hop_length, n_fft=n_fft
+    )
     chords = []
     for i in range(len(beat_frames) - 1):
         start_frame, end_frame = (beat_frames[i], beat_frames[i + 1])
@@ -119,8 +298,12 @@ def recognize_chords(
         best_chord, confidence = _get_max_correlation_item(correlations.items())
         if best_chord is None:
             continue
-        start_time = librosa.frames_to_time(start_frame)
-        end_time = librosa.frames_to_time(end_frame)
+        start_time = librosa.frames_to_time(
+            start_frame, sr=sr, hop_length=hop_length, n_fft=n_fft
+        )
+        end_time = librosa.frames_to_time(
+            end_frame, sr=sr, hop_length=hop_length, n_fft=n_fft
+        )
         chords.append(
             {
                 "start_time": round(start_time, 2),
@@ -137,4 +320,110 @@ def recognize_chords(
             merged_chords[-1]["end_time"] = chords[i]["end_time"]
         else:
             merged_chords.append(chords[i])
-    return merged_chords
\ No newline at end of file
+    return merged_chords
+
+
+STREAM_BLOCK_FRAMES = 256
+
+
+def stream_frame_params(native_sr: int, profile: AnalysisProfile) -> tuple[int, int]:
+    scale = 2 ** max(0, round(np.log2(native_sr / profile["sr"])))
+    return (profile["n_fft"] * scale, profile["hop_length"] * scale)
+
+
+def waveform_from_rms(rms: np.ndarray, points: int = 500) -> list[float]:
+    frames_per_point = len(rms) // points
+    if frames_per_point == 0:
+        return []
+    segments = rms[: frames_per_point * points].reshape(points, frames_per_point)
+    waveform = np.sqrt(np.mean(segments**2, axis=1))
+    max_val = waveform.max()
+    if max_val > 0:
+        waveform = waveform / max_val
+    return [float(val) for val in waveform]
+
+
+def analyze_file(
+    file_path: str,
+    profile: AnalysisProfile | None = None,
+    reporter: ProgressReporter | None = None,
+) -> dict[str, Any]:
+    profile = profile or get_profile()
+    reporter = reporter or ProgressReporter()
+    reporter.stage("Loading Audio", 5, 20)
+    y, sr = load_audio(file_path, profile)
+    tempo, beat_times = detect_tempo_and_beats(
+        y, sr, profile, reporter.stage("Detecting Tempo & Beats", 20, 45)
+    )
+    key_chroma = compute_chroma(
+        y, sr, {**profile, "chroma": "stft"}, reporter.stage("Detecting Key", 45, 60)
+    )
+    key = key_from_chroma(key_chroma)
+    on_chords_progress = reporter.stage("Recognizing Chords", 60, 95)
+    chord_chroma = key_chroma
+    if profile["chroma"] != "stft":
+        chord_chroma = compute_chroma(y, sr, profile, on_chords_progress)
+    chords = chords_from_chroma(chord_chroma, sr, beat_times, profile["hop_length"])
+    return {
+        "tempo": tempo,
+        "key": key,
+        "chords": chords,
+        "waveform_data": get_waveform_data(y),
+        "duration": librosa.get_duration(y=y, sr=sr),
+    }
+
+
+def analyze_stream(
+    file_path: str,
+    profile: AnalysisProfile | None = None,
+    reporter: ProgressReporter | None = None,
+) -> dict[str, Any]:
+    profile = profile or get_profile()
+    reporter = reporter or ProgressReporter()
+    on_progress = reporter.stage("Analyzing in Blocks", 5, 95)
+    native_sr = librosa.get_samplerate(file_path)
+    duration = librosa.get_duration(path=file_path)
+    total_samples = max(1, int(duration * native_sr))
+    n_fft, hop_length = stream_frame_params(native_sr, profile)
+    stream = librosa.stream(
+        file_path,
+        block_length=STREAM_BLOCK_FRAMES,
+        frame_length=n_fft,
+        hop_length=hop_length,
+        mono=True,
+        fill_value=0,
+    )
+    chroma_blocks = []
+    onset_blocks = []
+    rms_blocks = []
+    previous_mel = None
+    processed_samples = 0
+    for block in stream:
+        stft = librosa.stft(block, n_fft=n_fft, hop_length=hop_length, center=False)
+        S = np.abs(stft) ** 2
+        chroma_blocks.append(
+            librosa.feature.chroma_stft(S=S, sr=native_sr, n_fft=n_fft)
+        )
+        mel = librosa.power_to_db(librosa.feature.melspectrogram(S=S, sr=native_sr))
+        if previous_mel is None:
+            previous_mel = mel[:, :1]
+        onset = np.maximum(0.0, np.diff(np.hstack([previous_mel, mel]), axis=1))
+        onset_blocks.append(np.median(onset, axis=0))
+        previous_mel = mel[:, -1:]
+        rms_blocks.append(np.sqrt(np.mean(S, axis=0)))
+        processed_samples += S.shape[1] * hop_length
+        on_progress(processed_samples / total_samples)
+    chroma = np.hstack(chroma_blocks) if chroma_blocks else np.zeros((12, 0))
+    onset_envelope = np.concatenate(onset_blocks) if onset_blocks else np.zeros(0)
+    rms = np.concatenate(rms_blocks) if rms_blocks else np.zeros(0)
+    tempo, beat_frames = track_beats(onset_envelope, native_sr, hop_length)
+    beat_times = librosa.frames_to_time(
+        beat_frames, sr=native_sr, hop_length=hop_length, n_fft=n_fft
+    )
+    return {
+        "tempo": tempo,
+        "key": key_from_chroma(chroma),
+        "chords": chords_from_chroma(chroma, native_sr, beat_times, hop_length, n_fft),
+        "waveform_data": waveform_from_rms(rms),
+        "duration": duration,
+    }
@@ -0,0 +1,45 @@
+import os
+import secrets
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from .export import EXPORT_FORMATS, iter_export_archive
+from .results import is_analysis_id, list_analysis_ids
+
+EXPORT_TOKEN = os.environ.get("CHORD_ANALYZER_EXPORT_TOKEN", "")
+
+api = FastAPI()
+
+
+def _is_export_all_allowed(token: str) -> bool:
+    return bool(EXPORT_TOKEN) and secrets.compare_digest(
+        token.encode(), EXPORT_TOKEN.encode()
+    )
+
+
+@api.get("/api/export")
+def export_analyses(
+    ids: str = "",
+    formats: str = "midi,lab,jsonl",
+    x_export_token: str = Header(default=""),
+):
+    requested_formats = [fmt for fmt in formats.split(",") if fmt]
+    unknown_formats = [fmt for fmt in requested_formats if fmt not in EXPORT_FORMATS]
+    if not requested_formats or unknown_formats:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid formats. Choose from: {', '.join(EXPORT_FORMATS)}",
+        )
+    analysis_ids = [analysis_id for analysis_id in ids.split(",") if analysis_id]
+    if any(not is_analysis_id(analysis_id) for analysis_id in analysis_ids):
+        raise HTTPException(status_code=400, detail="Invalid analysis id.")
+    if not analysis_ids:
+        if not _is_export_all_allowed(x_export_token):
+            raise HTTPException(
+                status_code=403, detail="Exporting all analyses requires a token."
+            )
+        analysis_ids = list_analysis_ids()
+    return StreamingResponse(
+        iter_export_archive(analysis_ids, requested_formats),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="chord_analyses.zip"'},
+    )
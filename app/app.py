@@ -1,4 +1,5 @@
 import reflex as rx
+from .api import api
 from .state import State
 from .components import header, upload_view, uploading_view, analysis_view, results_view
 
@@ -34,5 +35,6 @@ app = rx.App(
             rel="stylesheet",
         ),
     ],
+    api_transformer=api,
 )
 app.add_page(index)
\ No newline at end of file
@@ -1,5 +1,5 @@
 import reflex as rx
-from .state import State
+from .state import SESSION_HEARTBEAT_MS, State
 
 
 def header() -> rx.Component:
@@ -27,6 +27,26 @@ def header() -> rx.Component:
     )
 
 
+def profile_selector() -> rx.Component:
+    return rx.el.div(
+        rx.el.label(
+            "Analysis profile",
+            html_for="analysis_profile",
+            class_name="text-sm font-medium text-gray-600",
+        ),
+        rx.el.select(
+            rx.el.option("Fast", value="fast"),
+            rx.el.option("Balanced", value="balanced"),
+            rx.el.option("Accurate", value="accurate"),
+            id="analysis_profile",
+            value=State.analysis_profile,
+            on_change=State.set_analysis_profile,
+            class_name="text-sm px-2 py-1 rounded-lg border border-gray-300 bg-white text-gray-700",
+        ),
+        class_name="flex items-center gap-3 mt-4",
+    )
+
+
 def upload_component() -> rx.Component:
     return rx.el.div(
         rx.upload.root(
@@ -98,6 +118,7 @@ def upload_view() -> rx.Component:
             class_name="text-gray-600 mb-8",
         ),
         upload_component(),
+        profile_selector(),
         rx.cond(
             State.error_message != "",
             rx.el.div(
@@ -267,7 +288,7 @@ def results_view() -> rx.Component:
                         class_name="text-2xl font-bold text-gray-800",
                     ),
                     rx.el.p(
-                        State.uploaded_filename.split("_")[-1],
+                        State.uploaded_filename,
                         class_name="text-gray-500 max-w-md truncate",
                     ),
                 ),
@@ -313,10 +334,23 @@ def results_view() -> rx.Component:
                         ),
                         class_name="text-center p-4 bg-white rounded-xl border border-gray-200 shadow-sm",
                     ),
+                    rx.el.p(
+                        "Profile: ",
+                        State.analysis_result["profile"],
+                        " (",
+                        State.analysis_result["mode"],
+                        ")",
+                        class_name="text-xs text-gray-400 text-center mt-2",
+                    ),
                 ),
                 chord_info_panel(),
                 class_name="mt-6 grid grid-cols-1 md:grid-cols-2 gap-6 items-start",
             ),
+            rx.moment(
+                interval=SESSION_HEARTBEAT_MS,
+                on_change=State.keep_session_alive,
+                class_name="hidden",
+            ),
             class_name="w-full max-w-5xl mx-auto",
         ),
         class_name="w-full flex flex-col items-center justify-center p-8",
@@ -24,6 +24,8 @@ class Analysis(TypedDict):
     progress: int
     tempo: float
     key: str
+    profile: str
+    mode: str
     created_at: datetime.datetime
 
 
@@ -39,4 +41,6 @@ class Chord(TypedDict):
 class AnalysisResult(TypedDict):
     tempo: float
     key: str
+    profile: str
+    mode: str
     chords: list[dict[str, str | float]]
\ No newline at end of file
@@ -0,0 +1,183 @@
+import io
+import json
+import zipfile
+from typing import Any, Iterable, Iterator
+import mido
+from .analysis import CHORD_QUALITIES, NOTES
+from .results import peek_result
+
+EXPORT_FORMATS = ["midi", "lab", "jsonl"]
+DEFAULT_TEMPO_BPM = 120.0
+MIDI_BASE_NOTE = 60
+MIDI_VELOCITY = 64
+NO_CHORD_LABEL = "N"
+UNKNOWN_CHORD_LABEL = "X"
+ACCIDENTALS = {"#": 1, "b": -1}
+EXPORT_CHORD_QUALITIES = {
+    **CHORD_QUALITIES,
+    "min7": [1, 0, 0, 1, 0, 0, 0, 1, 0, 0, 1, 0],
+    "maj7": [1, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1],
+}
+QUALITY_ALIASES = {
+    "": "maj",
+    "M": "maj",
+    "m": "min",
+    "-": "min",
+    "o": "dim",
+    "+": "aug",
+    "sus": "sus4",
+    "dom7": "7",
+    "m7": "min7",
+    "-7": "min7",
+    "M7": "maj7",
+}
+
+
+def parse_chord_name(chord_name: str) -> tuple[int, str] | None:
+    chord_name = chord_name.strip().split("/", 1)[0]
+    if not chord_name or chord_name[0].upper() not in NOTES:
+        return None
+    root = NOTES.index(chord_name[0].upper())
+    suffix = chord_name[1:]
+    if suffix[:1] in ACCIDENTALS:
+        root = (root + ACCIDENTALS[suffix[0]]) % len(NOTES)
+        suffix = suffix[1:]
+    suffix = suffix.lstrip(":")
+    quality = QUALITY_ALIASES.get(suffix, suffix)
+    if quality not in EXPORT_CHORD_QUALITIES:
+        return None
+    return (root, quality)
+
+
+def get_chord_notes(chord_name: str) -> list[int]:
+    parsed = parse_chord_name(chord_name)
+    if parsed is None:
+        return []
+    root, quality = parsed
+    return [
+        MIDI_BASE_NOTE + root + interval
+        for interval, active in enumerate(EXPORT_CHORD_QUALITIES[quality])
+        if active
+    ]
+
+
+def build_midi(chords: list[dict[str, Any]], tempo: float) -> mido.MidiFile:
+    midi_tempo = mido.bpm2tempo(tempo if tempo > 0 else DEFAULT_TEMPO_BPM)
+    mid = mido.MidiFile(type=0)
+    track = mido.MidiTrack()
+    mid.tracks.append(track)
+    track.append(mido.MetaMessage("set_tempo", tempo=midi_tempo, time=0))
+    position = 0
+    for chord in chords:
+        notes = get_chord_notes(chord["chord_name"])
+        if not notes:
+            continue
+        start_tick = round(
+            mido.second2tick(chord["start_time"], mid.ticks_per_beat, midi_tempo)
+        )
+        end_tick = round(
+            mido.second2tick(chord["end_time"], mid.ticks_per_beat, midi_tempo)
+        )
+        delta_on = max(0, start_tick - position)
+        for i, note in enumerate(notes):
+            track.append(
+                mido.Message(
+                    "note_on",
+                    note=note,
+                    velocity=MIDI_VELOCITY,
+                    time=delta_on if i == 0 else 0,
+                )
+            )
+        position += delta_on
+        delta_off = max(0, end_tick - position)
+        for i, note in enumerate(notes):
+            track.append(
+                mido.Message(
+                    "note_off",
+                    note=note,
+                    velocity=MIDI_VELOCITY,
+                    time=delta_off if i == 0 else 0,
+                )
+            )
+        position += delta_off
+    return mid
+
+
+def get_midi_bytes(chords: list[dict[str, Any]], tempo: float) -> bytes:
+    midi_bytes = io.BytesIO()
+    build_midi(chords, tempo).save(file=midi_bytes)
+    return midi_bytes.getvalue()
+
+
+def to_lab_label(chord_name: str) -> str:
+    if chord_name.strip() in ("", NO_CHORD_LABEL):
+        return NO_CHORD_LABEL
+    parsed = parse_chord_name(chord_name)
+    if parsed is None:
+        return UNKNOWN_CHORD_LABEL
+    root, quality = parsed
+    return f"{NOTES[root]}:{quality}"
+
+
+def get_lab_text(chords: list[dict[str, Any]]) -> str:
+    return "".join(
+        f"{chord['start_time']:.3f}\t{chord['end_time']:.3f}\t"
+        f"{to_lab_label(chord['chord_name'])}\n"
+        for chord in chords
+    )
+
+
+class _ZipSink(io.RawIOBase):
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_export_archive(
+    analysis_ids: Iterable[str], formats: Iterable[str]
+) -> Iterator[bytes]:
+    analysis_ids = list(analysis_ids)
+    formats = set(formats)
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        if formats & {"midi", "lab"}:
+            for analysis_id in analysis_ids:
+                slices = peek_result(analysis_id)
+                if slices is None:
+                    continue
+                meta, chords = slices
+                if "midi" in formats:
+                    archive.writestr(
+                        f"midi/{analysis_id}.mid", get_midi_bytes(chords, meta["tempo"])
+                    )
+                if "lab" in formats:
+                    archive.writestr(f"lab/{analysis_id}.lab", get_lab_text(chords))
+                data = sink.drain()
+                if data:
+                    yield data
+        if "jsonl" in formats:
+            with archive.open("analyses.jsonl", "w", force_zip64=True) as entry:
+                for analysis_id in analysis_ids:
+                    slices = peek_result(analysis_id)
+                    if slices is None:
+                        continue
+                    meta, chords = slices
+                    line = {"analysis_id": analysis_id, **meta, "chords": chords}
+                    entry.write((json.dumps(line) + "\n").encode())
+                    data = sink.drain()
+                    if data:
+                        yield data
+    data = sink.drain()
+    if data:
+        yield data
@@ -0,0 +1,185 @@
+import asyncio
+import contextlib
+import logging
+import os
+from typing import AsyncIterator, Literal, TypedDict
+import audioread
+import soundfile as sf
+from .analysis import (
+    AnalysisProfile,
+    CHUNK_FRAMES,
+    CQT_CONTEXT_SAMPLES,
+    ONSET_N_FFT,
+    STREAM_BLOCK_FRAMES,
+    TEMPO_AC_SIZE,
+    TEMPO_WINDOW_FRAMES,
+    stream_frame_params,
+)
+
+MEMORY_BUDGET_MB = int(os.environ.get("CHORD_ANALYZER_MEMORY_BUDGET_MB", "1024"))
+QUEUE_TIMEOUT_S = float(os.environ.get("CHORD_ANALYZER_QUEUE_TIMEOUT_S", "300"))
+FLOAT_BYTES = 4
+COMPLEX_BYTES = 8
+STFT_CELL_BYTES = COMPLEX_BYTES + FLOAT_BYTES
+CQT_BINS = 252
+MEL_BANDS = 128
+TUNING_SAMPLE_BYTES = 64
+TEMPOGRAM_CELL_BYTES = 64
+BEAT_TRACK_FRAME_BYTES = 64
+
+AdmissionDecision = Literal["admit", "queue", "stream", "reject"]
+AnalysisMode = Literal["full", "stream"]
+
+
+class AudioMetadata(TypedDict):
+    duration: float
+    channels: int
+    sample_rate: int
+    streamable: bool
+
+
+class AdmissionPlan(TypedDict):
+    decision: AdmissionDecision
+    mode: AnalysisMode
+    estimated_bytes: int
+    reason: str
+
+
+def probe_audio(file_path: str) -> AudioMetadata:
+    try:
+        info = sf.info(str(file_path))
+        return {
+            "duration": float(info.duration),
+            "channels": int(info.channels),
+            "sample_rate": int(info.samplerate),
+            "streamable": True,
+        }
+    except Exception:
+        pass
+    try:
+        with audioread.audio_open(str(file_path)) as f:
+            return {
+                "duration": float(f.duration),
+                "channels": int(f.channels),
+                "sample_rate": int(f.samplerate),
+                "streamable": False,
+            }
+    except Exception as e:
+        logging.exception(f"Error reading audio metadata: {e}")
+        raise IOError(f"Error reading audio metadata: {e}")
+
+
+def estimate_beat_tracking_bytes(frames: float, sr: float, hop_length: int) -> int:
+    win_length = TEMPO_AC_SIZE * sr / hop_length + 1
+    window_frames = min(frames, TEMPO_WINDOW_FRAMES + 2 * win_length)
+    tempogram_bytes = window_frames * win_length * TEMPOGRAM_CELL_BYTES
+    return int(tempogram_bytes + frames * BEAT_TRACK_FRAME_BYTES)
+
+
+def estimate_full_bytes(metadata: AudioMetadata, profile: AnalysisProfile) -> int:
+    native_samples = metadata["duration"] * metadata["sample_rate"]
+    samples = metadata["duration"] * profile["sr"]
+    hop_length = profile["hop_length"]
+    frames = samples / hop_length + 1
+    chunk_frames = min(frames, CHUNK_FRAMES)
+    signal_bytes = samples * FLOAT_BYTES
+    decode_bytes = native_samples * (metadata["channels"] + 1) * FLOAT_BYTES
+    mel_chunk_frames = chunk_frames + 2 * ONSET_N_FFT / hop_length
+    onset_bytes = (ONSET_N_FFT // 2 + 1) * mel_chunk_frames * STFT_CELL_BYTES
+    onset_bytes += frames * MEL_BANDS * FLOAT_BYTES * 3
+    beat_bytes = onset_bytes + estimate_beat_tracking_bytes(
+        frames, profile["sr"], hop_length
+    )
+    if profile["chroma"] == "cqt":
+        chroma_chunk_frames = chunk_frames + 2 * CQT_CONTEXT_SAMPLES / hop_length
+        chunk_bytes = CQT_BINS * chroma_chunk_frames * STFT_CELL_BYTES
+    else:
+        chroma_chunk_frames = chunk_frames + 2 * profile["n_fft"] / hop_length
+        chunk_bytes = (
+            (profile["n_fft"] // 2 + 1) * chroma_chunk_frames * STFT_CELL_BYTES
+        )
+    tuning_bytes = samples * TUNING_SAMPLE_BYTES
+    chroma_bytes = max(tuning_bytes, chunk_bytes) + frames * 12 * FLOAT_BYTES * 2
+    return int(signal_bytes + max(decode_bytes, beat_bytes, chroma_bytes))
+
+
+def estimate_stream_bytes(metadata: AudioMetadata, profile: AnalysisProfile) -> int:
+    n_fft, hop_length = stream_frame_params(metadata["sample_rate"], profile)
+    block_samples = n_fft + (STREAM_BLOCK_FRAMES - 1) * hop_length
+    block_bytes = block_samples * metadata["channels"] * FLOAT_BYTES * 2
+    stft_bytes = (n_fft // 2 + 1) * STREAM_BLOCK_FRAMES * (COMPLEX_BYTES + FLOAT_BYTES)
+    frames = metadata["duration"] * metadata["sample_rate"] / hop_length + 1
+    feature_bytes = frames * (12 + 2) * FLOAT_BYTES
+    block_peak_bytes = block_bytes + stft_bytes * 2
+    beat_bytes = estimate_beat_tracking_bytes(
+        frames, metadata["sample_rate"], hop_length
+    )
+    return int(feature_bytes + block_peak_bytes + beat_bytes)
+
+
+class ResourceGovernor:
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self.reserved_bytes = 0
+        self._condition: asyncio.Condition | None = None
+
+    @property
+    def available_bytes(self) -> int:
+        return self.budget_bytes - self.reserved_bytes
+
+    def _get_condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def plan(self, metadata: AudioMetadata, profile: AnalysisProfile) -> AdmissionPlan:
+        full_bytes = estimate_full_bytes(metadata, profile)
+        if full_bytes <= self.budget_bytes:
+            if full_bytes <= self.available_bytes:
+                return {
+                    "decision": "admit",
+                    "mode": "full",
+                    "estimated_bytes": full_bytes,
+                    "reason": "",
+                }
+            return {
+                "decision": "queue",
+                "mode": "full",
+                "estimated_bytes": full_bytes,
+                "reason": "Waiting for other analyses to finish",
+            }
+        stream_bytes = estimate_stream_bytes(metadata, profile)
+        if metadata["streamable"] and stream_bytes <= self.budget_bytes:
+            return {
+                "decision": "stream",
+                "mode": "stream",
+                "estimated_bytes": stream_bytes,
+                "reason": "File too large to decode at once, analyzing in blocks",
+            }
+        return {
+            "decision": "reject",
+            "mode": "full",
+            "estimated_bytes": full_bytes,
+            "reason": f"File needs about {full_bytes // 2**20} MB to analyze, "
+            f"which exceeds the {self.budget_bytes // 2**20} MB memory budget",
+        }
+
+    @contextlib.asynccontextmanager
+    async def reserve(
+        self, nbytes: int, timeout: float = QUEUE_TIMEOUT_S
+    ) -> AsyncIterator[None]:
+        condition = self._get_condition()
+        async with condition:
+            await asyncio.wait_for(
+                condition.wait_for(lambda: nbytes <= self.available_bytes), timeout
+            )
+            self.reserved_bytes += nbytes
+        try:
+            yield
+        finally:
+            async with condition:
+                self.reserved_bytes -= nbytes
+                condition.notify_all()
+
+
+governor = ResourceGovernor(MEMORY_BUDGET_MB * 2**20)
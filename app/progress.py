@@ -0,0 +1,55 @@
+import asyncio
+import os
+import threading
+from typing import Awaitable, Callable
+
+PROGRESS_INTERVAL_MS = int(os.environ.get("CHORD_ANALYZER_PROGRESS_INTERVAL_MS", "250"))
+
+ProgressCallback = Callable[[float], None]
+
+
+class ProgressReporter:
+    def __init__(self, interval_ms: int = PROGRESS_INTERVAL_MS):
+        self.interval_s = interval_ms / 1000
+        self._stage = ""
+        self._progress = 0
+        self._version = 0
+        self._lock = threading.Lock()
+        self._closed = asyncio.Event()
+
+    def report(self, progress: int, stage: str | None = None):
+        with self._lock:
+            if stage is not None and stage != self._stage:
+                self._stage = stage
+                self._version += 1
+            progress = min(100, max(self._progress, progress))
+            if progress != self._progress:
+                self._progress = progress
+                self._version += 1
+
+    def stage(self, name: str, start: int, end: int) -> ProgressCallback:
+        self.report(start, name)
+
+        def on_progress(fraction: float):
+            self.report(start + int((end - start) * min(1.0, fraction)))
+
+        return on_progress
+
+    def close(self):
+        self._closed.set()
+
+    async def pump(self, push: Callable[[str, int], Awaitable[None]]):
+        pushed_version = 0
+        while True:
+            closed = self._closed.is_set()
+            with self._lock:
+                version, stage, progress = (self._version, self._stage, self._progress)
+            if version != pushed_version:
+                await push(stage, progress)
+                pushed_version = version
+            if closed:
+                return
+            try:
+                await asyncio.wait_for(self._closed.wait(), self.interval_s)
+            except TimeoutError:
+                pass
@@ -0,0 +1,207 @@
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Literal
+from .governor import AnalysisMode
+from .storage import ArtifactKind, storage
+
+REDIS_URL = os.environ.get("REDIS_URL")
+RESULT_CACHE_SIZE = int(os.environ.get("CHORD_ANALYZER_RESULT_CACHE_SIZE", "256"))
+RESULT_TTL_S = int(os.environ.get("CHORD_ANALYZER_RESULT_TTL_S", "86400"))
+REDIS_KEY_PREFIX = "chord-analyzer:analysis"
+ANALYSIS_ID_PATTERN = re.compile(r"[0-9a-f]{64}-[a-z]+-[a-z]+")
+
+ResultSlice = Literal["meta", "chords", "waveform"]
+RESULT_SLICES: list[ResultSlice] = ["meta", "chords", "waveform"]
+SLICE_ARTIFACTS: dict[ResultSlice, ArtifactKind] = {
+    "meta": "features",
+    "chords": "features",
+    "waveform": "waveforms",
+}
+
+
+def get_analysis_id(upload_key: str, profile_name: str, mode: AnalysisMode) -> str:
+    return f"{upload_key}-{profile_name}-{mode}"
+
+
+class InProcessResultStore:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, ResultSlice], Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, analysis_id: str, part: ResultSlice, refresh: bool = True
+    ) -> Any | None:
+        with self._lock:
+            value = self._entries.get((analysis_id, part))
+            if value is not None and refresh:
+                self._entries.move_to_end((analysis_id, part))
+            return value
+
+    def put(self, analysis_id: str, payload: dict[ResultSlice, Any]):
+        with self._lock:
+            for part, value in payload.items():
+                self._entries[(analysis_id, part)] = value
+                self._entries.move_to_end((analysis_id, part))
+            while len(self._entries) > self.max_entries * len(RESULT_SLICES):
+                self._entries.popitem(last=False)
+
+    def ids(self) -> list[str]:
+        with self._lock:
+            return [
+                analysis_id for analysis_id, part in self._entries if part == "meta"
+            ]
+
+
+class RedisResultStore:
+    def __init__(self, url: str, ttl_s: int):
+        import redis
+
+        self.ttl_s = ttl_s
+        self._client = redis.Redis.from_url(url)
+        self._errors = redis.RedisError
+
+    def _key(self, analysis_id: str, part: ResultSlice) -> str:
+        return f"{REDIS_KEY_PREFIX}:{analysis_id}:{part}"
+
+    def ping(self):
+        self._client.ping()
+
+    def get(
+        self, analysis_id: str, part: ResultSlice, refresh: bool = True
+    ) -> Any | None:
+        key = self._key(analysis_id, part)
+        try:
+            value = self._client.get(key)
+            if value is None:
+                return None
+            if refresh:
+                self._client.expire(key, self.ttl_s)
+        except self._errors as e:
+            logging.warning(f"Redis read failed for {key}, using disk cache: {e}")
+            return None
+        return json.loads(value)
+
+    def put(self, analysis_id: str, payload: dict[ResultSlice, Any]):
+        pipeline = self._client.pipeline()
+        for part, value in payload.items():
+            pipeline.set(self._key(analysis_id, part), json.dumps(value), ex=self.ttl_s)
+        try:
+            pipeline.execute()
+        except self._errors as e:
+            logging.warning(f"Redis write failed for {analysis_id}: {e}")
+
+    def ids(self) -> list[str]:
+        prefix = f"{REDIS_KEY_PREFIX}:"
+        try:
+            return [
+                key.decode()[len(prefix) : -len(":meta")]
+                for key in self._client.scan_iter(match=f"{prefix}*:meta")
+            ]
+        except self._errors as e:
+            logging.warning(f"Redis scan failed, listing disk cache only: {e}")
+            return []
+
+
+def _create_result_store() -> InProcessResultStore | RedisResultStore:
+    if REDIS_URL:
+        try:
+            store = RedisResultStore(REDIS_URL, RESULT_TTL_S)
+            store.ping()
+            return store
+        except Exception as e:
+            logging.exception(f"Falling back to in-process result store: {e}")
+    return InProcessResultStore(RESULT_CACHE_SIZE)
+
+
+result_store = _create_result_store()
+
+
+def _split_cached_result(
+    features: dict[str, Any], waveform: list[float] | None
+) -> dict[ResultSlice, Any]:
+    payload: dict[ResultSlice, Any] = {
+        "meta": {
+            "tempo": features["tempo"],
+            "key": features["key"],
+            "profile": features["profile"],
+            "mode": features["mode"],
+            "duration": features["duration"],
+        },
+        "chords": features["chords"],
+    }
+    if waveform is not None:
+        payload["waveform"] = waveform
+    return payload
+
+
+def result_paths(analysis_id: str) -> list[Path]:
+    return [
+        storage.path("features", f"{analysis_id}.json"),
+        storage.path("waveforms", f"{analysis_id}.json"),
+    ]
+
+
+def save_result(
+    analysis_id: str,
+    meta: dict[str, Any],
+    chords: list[dict[str, Any]],
+    waveform: list[float],
+) -> list[Path]:
+    paths = [
+        storage.save_json("features", analysis_id, {**meta, "chords": chords}),
+        storage.save_json("waveforms", analysis_id, waveform),
+    ]
+    result_store.put(
+        analysis_id, {"meta": meta, "chords": chords, "waveform": waveform}
+    )
+    return paths
+
+
+def is_analysis_id(value: str) -> bool:
+    return ANALYSIS_ID_PATTERN.fullmatch(value) is not None
+
+
+def list_analysis_ids() -> list[str]:
+    return sorted(set(result_store.ids()) | set(storage.list_names("features")))
+
+
+def load_slice(analysis_id: str, part: ResultSlice) -> Any | None:
+    if not is_analysis_id(analysis_id):
+        return None
+    value = result_store.get(analysis_id, part)
+    if value is not None:
+        storage.touch(storage.path(SLICE_ARTIFACTS[part], f"{analysis_id}.json"))
+        return value
+    features = storage.load_json("features", analysis_id)
+    if features is None:
+        return None
+    waveform = storage.load_json("waveforms", analysis_id)
+    payload = _split_cached_result(features, waveform)
+    result_store.put(analysis_id, payload)
+    return payload.get(part)
+
+
+def has_result(analysis_id: str) -> bool:
+    return all(load_slice(analysis_id, part) is not None for part in RESULT_SLICES)
+
+
+def peek_result(
+    analysis_id: str,
+) -> tuple[dict[str, Any], list[dict[str, Any]]] | None:
+    if not is_analysis_id(analysis_id):
+        return None
+    meta = result_store.get(analysis_id, "meta", refresh=False)
+    chords = result_store.get(analysis_id, "chords", refresh=False)
+    if meta is not None and chords is not None:
+        return (meta, chords)
+    features = storage.load_json("features", analysis_id, touch=False)
+    if features is None:
+        return None
+    payload = _split_cached_result(features, None)
+    return (payload["meta"], payload["chords"])
@@ -2,26 +2,38 @@ import reflex as rx
 from typing import Literal, Any, cast
 import asyncio
 import time
-import random
-import string
-import librosa
+from pathlib import Path
 from . import analysis as audio_analysis
 from .database import AnalysisResult
+from .export import get_midi_bytes
+from .governor import governor, probe_audio
+from .progress import ProgressReporter
+from .results import (
+    get_analysis_id,
+    has_result,
+    load_slice,
+    result_paths,
+    save_result,
+)
+from .storage import SESSION_TTL_S, content_key, storage
 
 AnalysisStatus = Literal["idle", "uploading", "analyzing", "complete", "error"]
 ALLOWED_EXTENSIONS = ["mp3", "wav", "flac", "ogg", "m4a"]
+SHARED_RESULT_VARS = ["analysis_result", "waveform_data", "audio_duration"]
+SESSION_HEARTBEAT_MS = int(SESSION_TTL_S * 1000 / 4)
 
 
 class State(rx.State):
     analysis_status: AnalysisStatus = "idle"
     upload_progress: int = 0
     uploaded_filename: str = ""
+    upload_key: str = ""
     error_message: str = ""
     analysis_progress: int = 0
     analysis_stage: str = ""
-    analysis_result: AnalysisResult | None = None
-    waveform_data: list[float] = []
-    audio_duration: float = 0.0
+    analysis_profile: str = audio_analysis.DEFAULT_PROFILE
+    analysis_id: str = ""
+    _chord_edits: dict[str, str] = {}
     selected_chord_index: int = -1
     editing_chord_index: int = -1
 
@@ -37,15 +49,66 @@ class State(rx.State):
     def show_results(self) -> bool:
         return self.analysis_status == "complete"
 
+    @rx.var
+    def analysis_result(self) -> AnalysisResult | None:
+        meta = load_slice(self.analysis_id, "meta")
+        chords = load_slice(self.analysis_id, "chords")
+        if meta is None or chords is None:
+            return None
+        if self._chord_edits:
+            chords = [
+                (
+                    {
+                        **chord,
+                        "chord_name": self._chord_edits[str(i)],
+                        "confidence": 1.0,
+                    }
+                    if str(i) in self._chord_edits
+                    else chord
+                )
+                for i, chord in enumerate(chords)
+            ]
+        return {
+            "tempo": meta["tempo"],
+            "key": meta["key"],
+            "profile": meta["profile"],
+            "mode": meta["mode"],
+            "chords": chords,
+        }
+
+    @rx.var
+    def waveform_data(self) -> list[float]:
+        return load_slice(self.analysis_id, "waveform") or []
+
+    @rx.var
+    def audio_duration(self) -> float:
+        meta = load_slice(self.analysis_id, "meta")
+        return meta["duration"] if meta else 0.0
+
     @rx.var
     def selected_chord(self) -> dict | None:
         if self.analysis_result and self.selected_chord_index != -1:
             return self.analysis_result["chords"][self.selected_chord_index]
         return None
 
+    @rx.event
+    def set_analysis_profile(self, profile: str):
+        if profile in audio_analysis.PROFILES:
+            self.analysis_profile = profile
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        for var_name in SHARED_RESULT_VARS:
+            state.pop(self.computed_vars[var_name]._cache_attr, None)
+        return state
+
     def _get_file_extension(self, filename: str) -> str:
         return filename.split(".")[-1].lower()
 
+    def _get_upload_path(self) -> Path:
+        file_extension = self._get_file_extension(self.uploaded_filename)
+        return storage.path("uploads", f"{self.upload_key}.{file_extension}")
+
     @rx.event
     async def handle_upload(self, files: list[rx.UploadFile]):
         if not files:
@@ -60,76 +123,115 @@ class State(rx.State):
         self.error_message = ""
         self.uploaded_filename = upload_file.name
         upload_data = await upload_file.read()
-        upload_dir = rx.get_upload_dir()
-        upload_dir.mkdir(parents=True, exist_ok=True)
-        unique_suffix = "".join(
-            random.choices(string.ascii_letters + string.digits, k=8)
-        )
-        unique_name = f"{unique_suffix}_{upload_file.name}"
-        file_path = upload_dir / unique_name
-        total_size = len(upload_data)
-        chunk_size = 1024 * 1024
-        with file_path.open("wb") as f:
-            for i in range(0, total_size, chunk_size):
-                chunk = upload_data[i : i + chunk_size]
-                f.write(chunk)
-                progress = min(100, int((i + len(chunk)) / total_size * 100))
-                self.upload_progress = progress
-                yield
+        self.upload_key = content_key(upload_data)
+        file_path = self._get_upload_path()
+        storage.pin(self.router.session.client_token, file_path)
+        if storage.touch(file_path):
+            self.upload_progress = 100
+        else:
+            partial_path = storage.partial_path(file_path)
+            total_size = len(upload_data)
+            chunk_size = 1024 * 1024
+            with partial_path.open("wb") as f:
+                for i in range(0, total_size, chunk_size):
+                    chunk = upload_data[i : i + chunk_size]
+                    f.write(chunk)
+                    progress = min(100, int((i + len(chunk)) / total_size * 100))
+                    self.upload_progress = progress
+                    yield
+            partial_path.replace(file_path)
+            await asyncio.to_thread(storage.evict)
         self.analysis_status = "analyzing"
-        self.uploaded_filename = unique_name
         yield State.start_analysis
         return
 
+    async def _use_cached_result(self, analysis_id: str, session_id: str) -> bool:
+        if not await asyncio.to_thread(has_result, analysis_id):
+            return False
+        for path in result_paths(analysis_id):
+            storage.pin(session_id, path)
+        async with self:
+            self.analysis_id = analysis_id
+            self._chord_edits = {}
+            self.analysis_progress = 100
+            self.analysis_status = "complete"
+        return True
+
     @rx.event(background=True)
     async def start_analysis(self):
-        file_path = rx.get_upload_dir() / self.uploaded_filename
+        file_path = str(self._get_upload_path())
+        session_id = self.router.session.client_token
         try:
             async with self:
-                self.analysis_stage = "Loading Audio"
-                self.analysis_progress = 5
-            y, sr = audio_analysis.load_audio(file_path)
-            async with self:
-                self.analysis_stage = "Detecting Tempo & Beats"
-                self.analysis_progress = 20
-            yield
-            await asyncio.sleep(0.1)
-            tempo, beat_times = audio_analysis.detect_tempo_and_beats(y, sr)
-            async with self:
-                self.analysis_progress = 40
-            yield
-            async with self:
-                self.analysis_stage = "Detecting Key"
-                self.analysis_progress = 50
-            yield
-            await asyncio.sleep(0.1)
-            key = audio_analysis.detect_key(y, sr)
-            async with self:
-                self.analysis_progress = 60
-            yield
-            async with self:
-                self.analysis_stage = "Recognizing Chords"
-                self.analysis_progress = 70
-            yield
-            await asyncio.sleep(0.1)
-            chords = audio_analysis.recognize_chords(y, sr, beat_times)
-            async with self:
-                self.analysis_progress = 95
-            yield
-            waveform_data = audio_analysis.get_waveform_data(y)
-            audio_duration = librosa.get_duration(y=y, sr=sr)
-            async with self:
-                self.analysis_stage = "Finalizing"
-                self.analysis_result = {
-                    "tempo": float(tempo),
-                    "key": key,
-                    "chords": chords,
+                self.analysis_stage = "Checking Resources"
+                self.analysis_progress = 2
+                profile = audio_analysis.get_profile(self.analysis_profile)
+            analysis_id = get_analysis_id(self.upload_key, profile["name"], "full")
+            if await self._use_cached_result(analysis_id, session_id):
+                return
+            metadata = await asyncio.to_thread(probe_audio, file_path)
+            plan = governor.plan(metadata, profile)
+            if plan["decision"] == "reject":
+                async with self:
+                    self.analysis_status = "error"
+                    self.error_message = plan["reason"]
+                return
+            if plan["mode"] != "full":
+                analysis_id = get_analysis_id(
+                    self.upload_key, profile["name"], plan["mode"]
+                )
+                if await self._use_cached_result(analysis_id, session_id):
+                    return
+            reporter = ProgressReporter()
+            if plan["decision"] != "admit":
+                reporter.report(2, plan["reason"])
+
+            async def push_progress(stage: str, progress: int):
+                async with self:
+                    self.analysis_stage = stage
+                    self.analysis_progress = progress
+
+            pump = asyncio.create_task(reporter.pump(push_progress))
+            try:
+                async with governor.reserve(plan["estimated_bytes"]):
+                    analyze = (
+                        audio_analysis.analyze_stream
+                        if plan["mode"] == "stream"
+                        else audio_analysis.analyze_file
+                    )
+                    analyzed = await asyncio.to_thread(
+                        analyze, file_path, profile, reporter
+                    )
+                reporter.report(95, "Finalizing")
+                meta = {
+                    "tempo": float(analyzed["tempo"]),
+                    "key": analyzed["key"],
+                    "profile": profile["name"],
+                    "mode": plan["mode"],
+                    "duration": analyzed["duration"],
                 }
-                self.waveform_data = waveform_data
-                self.audio_duration = audio_duration
+                saved_paths = await asyncio.to_thread(
+                    save_result,
+                    analysis_id,
+                    meta,
+                    analyzed["chords"],
+                    analyzed["waveform_data"],
+                )
+                for path in saved_paths:
+                    storage.pin(session_id, path)
+                await asyncio.to_thread(storage.evict)
+            finally:
+                reporter.close()
+                await pump
+            async with self:
+                self.analysis_id = analysis_id
+                self._chord_edits = {}
                 self.analysis_progress = 100
-                await asyncio.sleep(0.5)
                 self.analysis_status = "complete"
+        except TimeoutError:
+            async with self:
+                self.analysis_status = "error"
+                self.error_message = "Server is busy, please try again later."
         except Exception as e:
             import logging
 
@@ -138,6 +240,10 @@ class State(rx.State):
                 self.analysis_status = "error"
                 self.error_message = f"Analysis failed: {str(e)}"
 
+    @rx.event
+    def keep_session_alive(self, _: str):
+        storage.keep_alive(self.router.session.client_token)
+
     @rx.event
     def select_chord(self, index: int):
         self.selected_chord_index = index
@@ -156,81 +262,31 @@ class State(rx.State):
         index = int(form_data.get("index", -1))
         new_name = form_data.get("chord_name", "").strip()
         if index != -1 and new_name and self.analysis_result:
-            self.analysis_result["chords"][index]["chord_name"] = new_name
-            self.analysis_result["chords"][index]["confidence"] = 1.0
+            self._chord_edits = {**self._chord_edits, str(index): new_name}
         self.editing_chord_index = -1
 
-    def _get_note_number(self, note_name: str) -> int:
-        notes_map = {
-            "C": 0,
-            "C#": 1,
-            "D": 2,
-            "D#": 3,
-            "E": 4,
-            "F": 5,
-            "F#": 6,
-            "G": 7,
-            "G#": 8,
-            "A": 9,
-            "A#": 10,
-            "B": 11,
-        }
-        return notes_map.get(note_name.upper(), 60)
-
     @rx.event
     def export_midi(self) -> rx.event.EventSpec:
         if not self.analysis_result or not self.analysis_result["chords"]:
             return rx.toast("No chords to export.")
-        import mido
-        import io
-
-        mid = mido.MidiFile(type=0)
-        track = mido.MidiTrack()
-        mid.tracks.append(track)
-        ticks_per_beat = mid.ticks_per_beat
-        tempo = self.analysis_result["tempo"]
-        if tempo > 0:
-            mido.bpm2tempo(tempo)
-        last_event_time_ticks = 0
-        for chord in self.analysis_result["chords"]:
-            chord_name = chord["chord_name"]
-            root_str = chord_name[0]
-            if len(chord_name) > 1 and chord_name[1] == "#":
-                root_str = chord_name[:2]
-            root_note = self._get_note_number(root_str) + 60
-            start_time_ticks = mido.second2tick(
-                chord["start_time"], ticks_per_beat, mido.bpm2tempo(tempo)
-            )
-            end_time_ticks = mido.second2tick(
-                chord["end_time"], ticks_per_beat, mido.bpm2tempo(tempo)
-            )
-            delta_on = int(start_time_ticks - last_event_time_ticks)
-            delta_off = int(end_time_ticks - start_time_ticks)
-            track.append(
-                mido.Message("note_on", note=root_note, velocity=64, time=delta_on)
-            )
-            track.append(
-                mido.Message("note_off", note=root_note, velocity=64, time=delta_off)
-            )
-            last_event_time_ticks = end_time_ticks
-        midi_bytes = io.BytesIO()
-        mid.save(file=midi_bytes)
-        midi_bytes.seek(0)
-        cleaned_filename = self.uploaded_filename.split("_", 1)[-1].rsplit(".", 1)[0]
-        return rx.download(
-            data=midi_bytes.read(), filename=f"{cleaned_filename}_chords.mid"
+        midi_bytes = get_midi_bytes(
+            self.analysis_result["chords"], self.analysis_result["tempo"]
         )
+        cleaned_filename = self.uploaded_filename.rsplit(".", 1)[0]
+        return rx.download(data=midi_bytes, filename=f"{cleaned_filename}_chords.mid")
 
     @rx.event
-    def reset_state(self):
+    async def reset_state(self):
+        storage.release(self.router.session.client_token)
+        await asyncio.to_thread(storage.evict)
         self.analysis_status = "idle"
         self.upload_progress = 0
         self.uploaded_filename = ""
+        self.upload_key = ""
         self.error_message = ""
         self.analysis_progress = 0
         self.analysis_stage = ""
-        self.analysis_result = None
-        self.waveform_data = []
-        self.audio_duration = 0.0
+        self.analysis_id = ""
+        self._chord_edits = {}
         self.selected_chord_index = -1
-        self.editing_chord_index = -1
\ No newline at end of file
+        self.editing_chord_index = -1
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from pathlib import Path
+from typing import Any, Literal
+import reflex as rx
+
+STORAGE_QUOTA_MB = int(os.environ.get("CHORD_ANALYZER_STORAGE_QUOTA_MB", "2048"))
+STORAGE_MAX_AGE_HOURS = float(
+    os.environ.get("CHORD_ANALYZER_STORAGE_MAX_AGE_HOURS", "72")
+)
+SESSION_TTL_S = float(os.environ.get("CHORD_ANALYZER_SESSION_TTL_S", "21600"))
+PARTIAL_SUFFIX = ".part"
+
+ArtifactKind = Literal["uploads", "features", "waveforms"]
+ARTIFACT_KINDS: list[ArtifactKind] = ["uploads", "features", "waveforms"]
+RESULT_KINDS: list[ArtifactKind] = ["features", "waveforms"]
+
+
+def content_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ContentStore:
+    def __init__(
+        self,
+        quota_bytes: int,
+        max_age_s: float,
+        session_ttl_s: float,
+        root: Path | None = None,
+    ):
+        self.quota_bytes = quota_bytes
+        self.max_age_s = max_age_s
+        self.session_ttl_s = session_ttl_s
+        self._root = root
+        self._pins: dict[str, tuple[set[Path], float]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def root(self) -> Path:
+        if self._root is None:
+            self._root = rx.get_upload_dir() / "store"
+        return self._root
+
+    def path(self, kind: ArtifactKind, name: str) -> Path:
+        directory = self.root / kind
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory / name
+
+    def touch(self, path: Path) -> bool:
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def list_names(self, kind: ArtifactKind, suffix: str = ".json") -> list[str]:
+        directory = self.root / kind
+        if not directory.is_dir():
+            return []
+        return [path.name[: -len(suffix)] for path in directory.glob(f"*{suffix}")]
+
+    def partial_path(self, path: Path) -> Path:
+        return path.with_name(f"{path.name}.{secrets.token_hex(4)}{PARTIAL_SUFFIX}")
+
+    def load_json(
+        self, kind: ArtifactKind, name: str, touch: bool = True
+    ) -> Any | None:
+        path = self.path(kind, f"{name}.json")
+        try:
+            with path.open("r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.warning(f"Discarding unreadable cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+        if touch:
+            self.touch(path)
+        return data
+
+    def save_json(self, kind: ArtifactKind, name: str, data: Any) -> Path:
+        path = self.path(kind, f"{name}.json")
+        partial = self.partial_path(path)
+        with partial.open("w") as f:
+            json.dump(data, f)
+        partial.replace(path)
+        return path
+
+    def pin(self, session_id: str, path: Path):
+        with self._lock:
+            paths, _ = self._pins.get(session_id, (set(), 0.0))
+            paths.add(path)
+            self._pins[session_id] = (paths, time.time())
+
+    def keep_alive(self, session_id: str):
+        with self._lock:
+            pinned = self._pins.get(session_id)
+            if pinned is not None:
+                self._pins[session_id] = (pinned[0], time.time())
+
+    def release(self, session_id: str):
+        with self._lock:
+            self._pins.pop(session_id, None)
+
+    def _live_pins(self, now: float) -> set[Path]:
+        with self._lock:
+            expired = [
+                session_id
+                for session_id, (_, last_seen) in self._pins.items()
+                if now - last_seen > self.session_ttl_s
+            ]
+            for session_id in expired:
+                del self._pins[session_id]
+            return {path for paths, _ in self._pins.values() for path in paths}
+
+    def _eviction_group(self, path: Path) -> list[Path]:
+        if path.parent.name not in RESULT_KINDS:
+            return [path]
+        return [self.root / kind / path.name for kind in RESULT_KINDS]
+
+    def evict(self) -> int:
+        now = time.time()
+        pinned = self._live_pins(now)
+        entries = []
+        for kind in ARTIFACT_KINDS:
+            directory = self.root / kind
+            if not directory.is_dir():
+                continue
+            for path in directory.iterdir():
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort(key=lambda entry: entry[0])
+        sizes = {path: size for _, size, path in entries}
+        total_bytes = sum(sizes.values())
+        freed_bytes = 0
+        for last_access, _, path in entries:
+            if path not in sizes:
+                continue
+            group = [member for member in self._eviction_group(path) if member in sizes]
+            if any(member in pinned for member in group):
+                continue
+            expired = now - last_access > self.max_age_s
+            if path.name.endswith(PARTIAL_SUFFIX) and not expired:
+                continue
+            if not expired and total_bytes - freed_bytes <= self.quota_bytes:
+                break
+            for member in group:
+                member.unlink(missing_ok=True)
+                freed_bytes += sizes.pop(member)
+        if freed_bytes:
+            logging.info(f"Evicted {freed_bytes} bytes from {self.root}")
+        return freed_bytes
+
+
+storage = ContentStore(
+    quota_bytes=STORAGE_QUOTA_MB * 2**20,
+    max_age_s=STORAGE_MAX_AGE_HOURS * 3600,
+    session_ttl_s=SESSION_TTL_S,
+)
@@ -0,0 +1,78 @@
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+import numpy as np
+import soundfile as sf
+from app.analysis import NOTES, PROFILES, analyze_file, get_profile
+
+SR = 22050
+TEMPO_BPM = 120.0
+PROGRESSION = ["C", "G", "A", "F"]
+PROGRESSION_QUALITIES = ["maj", "maj", "min", "maj"]
+OUTPUT_PATH = Path(__file__).resolve().parent.parent / "bench_output.txt"
+
+
+def synthesize_signal(duration: float, sr: int = SR) -> np.ndarray:
+    t = np.arange(int(duration * sr)) / sr
+    beat_s = 60.0 / TEMPO_BPM
+    bar_s = beat_s * 4
+    y = np.zeros_like(t)
+    for bar_start in np.arange(0.0, duration, bar_s):
+        index = int(bar_start / bar_s) % len(PROGRESSION)
+        root = NOTES.index(PROGRESSION[index])
+        third = 3 if PROGRESSION_QUALITIES[index] == "min" else 4
+        mask = (t >= bar_start) & (t < bar_start + bar_s)
+        for interval in (0, third, 7):
+            freq = 261.63 * 2 ** ((root + interval) / 12)
+            y[mask] += 0.2 * np.sin(2 * np.pi * freq * t[mask])
+    click = np.exp(-np.arange(int(0.03 * sr)) / (0.005 * sr))
+    for beat_start in np.arange(0.0, duration, beat_s):
+        start = int(beat_start * sr)
+        end = min(len(y), start + len(click))
+        y[start:end] += 0.8 * click[: end - start]
+    return (y / np.max(np.abs(y))).astype(np.float32)
+
+
+def run(duration: float, repeats: int) -> list[str]:
+    lines = [
+        f"analyze_file on a {duration:.0f}s synthetic signal, best of {repeats}",
+        f"{'profile':<10} {'seconds':>8} {'x realtime':>11} {'peak MB':>8}",
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = str(Path(tmp_dir) / "synthetic.wav")
+        sf.write(file_path, synthesize_signal(duration), SR)
+        for name in PROFILES:
+            profile = get_profile(name)
+            analyze_file(file_path, profile)
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                analyze_file(file_path, profile)
+                timings.append(time.perf_counter() - start)
+            tracemalloc.start()
+            analyze_file(file_path, profile)
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            best = min(timings)
+            lines.append(
+                f"{name:<10} {best:>8.2f} {duration / best:>11.1f} "
+                f"{peak_bytes / 2**20:>8.1f}"
+            )
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time analysis profiles.")
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    lines = run(args.duration, args.repeats)
+    report = "\n".join(lines) + "\n"
+    print(report, end="")
+    OUTPUT_PATH.write_text(report)
+
+
+if __name__ == "__main__":
+    main()